@@ -9,7 +9,10 @@ Python module that can be used to send messages via a generic webhook
 mechanism.
 
 This module will include support for posting messages only if the requests
-module and related dependencies are included.
+module and related dependencies are included.  Asynchronous posting is
+supported only if the aiohttp module is also available.  HTTP/2 is supported
+only if the httpx module, with HTTP/2 support, is available.  The orjson module
+is used for JSON encoding and decoding when available.
 
 """
 
@@ -18,14 +21,32 @@ module and related dependencies are included.
 #
 
 import time
+import socket
+import threading
+import asyncio
 import struct
 import hashlib
-import hmac
 import json
 import base64
 import requests
+import urllib3
 import cherrypy
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .rest_api_common_v1 import *
 
 ###############################################################################
@@ -38,6 +59,71 @@ The default slug to use to obtain time deltas.
 
 """
 
+DEFAULT_MINIMUM_TIME_DELTA_REFRESH = 300
+"""
+The default minimum interval, in seconds, between time delta queries.
+
+"""
+
+HASH_TIME_STRUCT = struct.Struct('<Q')
+"""
+Precompiled structure used to append the time window to the secret when
+generating the HMAC key.
+
+"""
+
+USER_AGENT = "Inesonic, LLC"
+"""
+The user agent reported on every outbound request.
+
+"""
+
+POOL_CONNECTIONS = 4
+"""
+The number of connection pools to cache in the underlying HTTP session.
+
+"""
+
+POOL_MAXIMUM_SIZE = 16
+"""
+The maximum number of connections to keep alive per pool.
+
+"""
+
+MAXIMUM_RETRIES = 3
+"""
+The maximum number of times a request is retried on connection errors or
+transient server errors.
+
+"""
+
+RETRY_BACKOFF_FACTOR = 0.2
+"""
+The backoff factor, in seconds, applied between retries.  The delay doubles
+with each retry.
+
+"""
+
+RETRY_STATUS_CODES = (502, 503, 504)
+"""
+HTTP status codes that indicate a transient error and trigger a retry.  Used
+by both the requests and the httpx transports.  The asynchronous API does not
+retry.
+
+"""
+
+ASYNC_CONNECTION_LIMIT = 100
+"""
+The maximum number of simultaneous connections used by the asynchronous API.
+
+"""
+
+ASYNC_DNS_CACHE_TIMEOUT = 300
+"""
+The time, in seconds, that DNS lookups are cached by the asynchronous API.
+
+"""
+
 ###############################################################################
 # Class Server:
 #
@@ -51,7 +137,10 @@ class Server(object):
     def __init__(
         self,
         scheme_and_host,
-        time_delta_slug = DEFAULT_TIME_DELTA_SLUG
+        time_delta_slug = DEFAULT_TIME_DELTA_SLUG,
+        minimum_time_delta_refresh = DEFAULT_MINIMUM_TIME_DELTA_REFRESH,
+        binary_framing = False,
+        http2 = False
         ):
         """
         Method that initializes the Server class.
@@ -63,15 +152,110 @@ class Server(object):
             The endpoint used to determine the time delta between this
             machine and the server.
 
-        :type scheme_and_host: str
+        :param minimum_time_delta_refresh:
+            The minimum interval, in seconds, between time delta queries.  The
+            time delta is only queried when the server rejects a message as
+            unauthorized.
+
+        :param binary_framing:
+            If True, :meth:`post_message` sends messages using the binary
+            framing used by :meth:`post_binary_message` rather than the base-64
+            encoded JSON envelope.  The endpoints on the remote server must
+            accept binary messages.
+
+        :param http2:
+            If True, synchronous posts are sent using the httpx module over
+            HTTP/2, allowing posts to share a single multiplexed connection.
+            Requires the httpx module with HTTP/2 support.  The same retry
+            policy is applied to connection failures and to the status codes
+            in RETRY_STATUS_CODES.
+
+        :type scheme_and_host:            str
+        :type time_delta_slug:            str
+        :type minimum_time_delta_refresh: int or float
+        :type binary_framing:             bool
+        :type http2:                      bool
 
         """
 
         super().__init__()
 
         self.__scheme_and_host = self.__fix_scheme_and_host(scheme_and_host)
-        self.__time_delta_slug = self.__fix_slug(time_delta_slug)
+        self.__url_cache = {}
+        self.__time_delta_url = self.__url(time_delta_slug)
         self.__current_time_delta = 0
+        self.__last_time_delta_query = 0.0
+        self.__minimum_time_delta_refresh = minimum_time_delta_refresh
+        self.__time_delta_lock = threading.Lock()
+        self.__time_delta_async_lock = None
+        self.__binary_framing = binary_framing
+        self.__hmac_cache = {}
+        self.__hmac_cache_window = None
+        self.__http2 = http2
+
+        if http2:
+            if httpx is None:
+                raise RuntimeError("The httpx module is required for HTTP/2")
+
+            transport = httpx.HTTPTransport(
+                http2 = True,
+                retries = MAXIMUM_RETRIES,
+                limits = httpx.Limits(
+                    max_keepalive_connections = POOL_MAXIMUM_SIZE
+                ),
+                socket_options = [
+                    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                ]
+            )
+
+            self.__session = httpx.Client(
+                transport = transport,
+                headers = { 'User-Agent' : USER_AGENT },
+                timeout = None
+            )
+        else:
+            retry = urllib3.util.Retry(
+                total = MAXIMUM_RETRIES,
+                backoff_factor = RETRY_BACKOFF_FACTOR,
+                status_forcelist = RETRY_STATUS_CODES,
+                allowed_methods = frozenset([ 'POST' ]),
+                raise_on_status = False
+            )
+
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections = POOL_CONNECTIONS,
+                pool_maxsize = POOL_MAXIMUM_SIZE,
+                max_retries = retry
+            )
+
+            self.__session = requests.Session()
+            self.__session.headers.update({ 'User-Agent' : USER_AGENT })
+            self.__session.mount('http://', adapter)
+            self.__session.mount('https://', adapter)
+
+        self.__async_session = None
+
+
+    def close(self):
+        """
+        Method you can use to release any connections held by this server
+        instance.
+
+        """
+
+        self.__session.close()
+
+
+    async def close_async(self):
+        """
+        Method you can use to release any connections held by the asynchronous
+        API.  Must be awaited from the event loop used to post messages.
+
+        """
+
+        if self.__async_session is not None:
+            await self.__async_session.close()
+            self.__async_session = None
 
 
     def post_message(self, slug, secret, message):
@@ -91,21 +275,122 @@ class Server(object):
 
         :return:
             Returns a dictionary with the response or None if an error occured.
+            When binary framing is enabled, the response is decoded as
+            described for :meth:`post_binary_message` and may be a bytes
+            instance.
+
+        :type slug:    str
+        :type secret:  bytes or bytearray
+        :type message: dict
+        :rtype:        dict, bytes, or None
+
+        """
+
+        if self.__binary_framing:
+            response = self.post_binary_message(
+                slug,
+                secret,
+                encode_json(message)
+            )
+        else:
+            url = self.__url(slug)
+            time_delta = self.__current_time_delta
+            status_code, response = self.__post_message(
+                url,
+                secret,
+                message
+            )
+            if status_code == 401 and self.__time_delta_updated(time_delta):
+                status_code, response = self.__post_message(
+                    url,
+                    secret,
+                    message
+                )
+
+        return response
+
+
+    def post_messages(self, slug, secret, messages):
+        """
+        Method that will issue a sequence of requests to the same endpoint on
+        a remote server.  All messages share the pooled connection, the cached
+        URL, and the cached HMAC state.  Time delta queries are rate limited
+        so rejected messages in the sequence do not each trigger a query.
+
+        :param slug:
+            The slug to be used.
+
+        :param secret:
+            The Inesonic secret to be used to authenticate the messages.
+
+        :param messages:
+            An iterable of dictionaries holding the messages to be sent.
+
+        :return:
+            Returns a list holding the response to each message, in order.
+            Entries are None if an error occurred for that message.
+
+        :type slug:     str
+        :type secret:   bytes or bytearray
+        :type messages: list
+        :rtype:         list
+
+        """
+
+        return [
+            self.post_message(slug, secret, message) for message in messages
+        ]
+
+
+    async def post_message_async(self, slug, secret, message):
+        """
+        Coroutine version of :meth:`post_message`.  Multiple messages can be
+        posted concurrently from a single event loop, for example by using
+        asyncio.gather.  Requires the aiohttp module.
+
+        :param slug:
+            The slug to be used.
+
+        :param secret:
+            The Inesonic secret to be used to authenticate the message.
+
+        :param message:
+            A dictionary holding the message to be sent.
+
+        :return:
+            Returns a dictionary with the response or None if an error occured.
+            When binary framing is enabled, the response is decoded as
+            described for :meth:`post_binary_message` and may be a bytes
+            instance.
 
         :type slug:    str
         :type secret:  bytes or bytearray
         :type message: dict
-        :rtype:        dict or None
+        :rtype:        dict, bytes, or None
 
         """
 
-        fixed_slug = self.__fix_slug(slug)
-        response = self.__post_message(fixed_slug, secret, message)
-        if response is None:
-            new_time_delta = self.__time_delta()
-            if new_time_delta is not None:
-                self.__current_time_delta = new_time_delta
-                response = self.__post_message(fixed_slug, secret, message)
+        if self.__binary_framing:
+            response = await self.post_binary_message_async(
+                slug,
+                secret,
+                encode_json(message)
+            )
+        else:
+            url = self.__url(slug)
+            time_delta = self.__current_time_delta
+            status_code, response = await self.__post_message_async(
+                url,
+                secret,
+                message
+            )
+            if status_code == 401                                 and \
+               await self.__time_delta_updated_async(time_delta)      :
+                status_code, response = await self.__post_message_async(
+                    url,
+                    secret,
+                    message
+                )
 
         return response
 
@@ -136,59 +421,90 @@ class Server(object):
 
         """
 
-        fixed_slug = self.__fix_slug(slug)
+        url = self.__url(slug)
+        time_delta = self.__current_time_delta
         (
             status_code,
             response_data,
             headers
         ) = self.__post_binary_message(
-            fixed_slug,
+            url,
             secret,
             message
         )
 
-        if status_code == 401: # We got an unauthorized response.
-            new_time_delta = self.__time_delta()
-            if new_time_delta is not None:
-                self.__current_time_delta = new_time_delta
-
-                (
-                    status_code,
-                    response_data,
-                    headers
-                ) = self.__post_binary_message(
-                    fixed_slug,
-                    secret,
-                    message
-                )
+        if status_code == 401 and self.__time_delta_updated(time_delta):
+            (
+                status_code,
+                response_data,
+                headers
+            ) = self.__post_binary_message(
+                url,
+                secret,
+                message
+            )
 
-        if status_code == 200: # OK
-            content_type = None
-            if 'content-type' in headers:
-                content_type = headers['content-type']
-            else:
-                cleaned_headers = { k.lower(): v for k,v in headers.items() }
-                if 'content-type' in headers:
-                    content_type = headers['content-type']
+        return self.__decode_binary_response(
+            status_code,
+            response_data,
+            headers
+        )
 
-            if content_type is None:
-                try:
-                    result = base64.b64decode(response_data)
-                except:
-                    result = bytes(response_data)
-            else:
-                content_type = content_type.lower()
-                if content_type == 'application/json':
-                    try:
-                        result = json.loads(response_data)
-                    except:
-                        result = None
-                else:
-                    result = bytes(response_data)
-        else:
-            result = None
 
-        return result
+    async def post_binary_message_async(self, slug, secret, message):
+        """
+        Coroutine version of :meth:`post_binary_message`.  Requires the
+        aiohttp module.
+
+        :param slug:
+            The slug to be used.
+
+        :param secret:
+            The Inesonic secret to be used to authenticate the message.
+
+        :param message:
+            The raw binary message.
+
+        :return:
+            Returns either a dictionary or a bytes instance depending on the
+            content type reported by the server.  None is returned on error.
+
+        :type slug:    str
+        :type secret:  bytes or bytearray
+        :type message: bytes or bytearray
+        :rtype:        bytes, dict, or None
+
+        """
+
+        url = self.__url(slug)
+        time_delta = self.__current_time_delta
+        (
+            status_code,
+            response_data,
+            headers
+        ) = await self.__post_binary_message_async(
+            url,
+            secret,
+            message
+        )
+
+        if status_code == 401                                     and \
+           await self.__time_delta_updated_async(time_delta)          :
+            (
+                status_code,
+                response_data,
+                headers
+            ) = await self.__post_binary_message_async(
+                url,
+                secret,
+                message
+            )
+
+        return self.__decode_binary_response(
+            status_code,
+            response_data,
+            headers
+        )
 
 
     def post_customer_message(
@@ -227,23 +543,78 @@ class Server(object):
 
         """
 
-        fixed_slug = self.__fix_slug(slug)
-        response = self.__post_customer_message(
-            fixed_slug,
-            customer_identifier,
+        url = self.__url(slug)
+        time_delta = self.__current_time_delta
+        status_code, response = self.__post_message(
+            url,
             customer_secret,
-            message
+            message,
+            customer_identifier
         )
-        if response is None:
-            new_time_delta = self.__time_delta()
-            if new_time_delta is not None:
-                self.__current_time_delta = new_time_delta
-                response = self.__post_customer_message(
-                    fixed_slug,
-                    customer_identifier,
-                    customer_secret,
-                    message
-                )
+        if status_code == 401 and self.__time_delta_updated(time_delta):
+            status_code, response = self.__post_message(
+                url,
+                customer_secret,
+                message,
+                customer_identifier
+            )
+
+        return response
+
+
+    async def post_customer_message_async(
+        self,
+        slug,
+        customer_identifier,
+        customer_secret,
+        message
+        ):
+        """
+        Coroutine version of :meth:`post_customer_message`.  Messages for
+        multiple customers can be posted concurrently from a single event
+        loop, for example by using asyncio.gather.  Requires the aiohttp
+        module.
+
+        :param slug:
+            The slug to be used.
+
+        :param customer_identifier:
+            The customer identifier used to identify this customer.
+
+        :param customer_secret:
+            The customer specific secret to be used to authenticate the
+            message.
+
+        :param message:
+            A dictionary holding the message to be sent.
+
+        :return:
+            Returns a dictionary with the response or None if an error occured.
+
+        :type slug:                str
+        :type customer_identifier: str
+        :type customer_secret:     bytes or bytearray
+        :type message:             dict
+        :rtype:                    dict or None
+
+        """
+
+        url = self.__url(slug)
+        time_delta = self.__current_time_delta
+        status_code, response = await self.__post_message_async(
+            url,
+            customer_secret,
+            message,
+            customer_identifier
+        )
+        if status_code == 401                                     and \
+           await self.__time_delta_updated_async(time_delta)          :
+            status_code, response = await self.__post_message_async(
+                url,
+                customer_secret,
+                message,
+                customer_identifier
+            )
 
         return response
 
@@ -269,135 +640,205 @@ class Server(object):
 
         """
 
-        url = "%s/%s"%(self.__scheme_and_host, self.__time_delta_slug)
-
         message_payload = { 'timestamp' : int(time.time()) }
-        payload = json.dumps(message_payload)
-
-        response = requests.post(
-            url,
-            data = payload,
-            headers = {
-                'User-Agent' : 'Inesonic, LLC',
-                'Content-Type' : 'application/json',
-                'Content-Length' : str(len(payload))
-            }
+        response = self.__post(
+            self.__time_delta_url,
+            encode_json(message_payload),
+            'application/json'
         )
 
-        if response.status_code == 200:
+        if response is not None and response.status_code == 200:
             try:
-                json_result = json.loads(response.text)
+                json_result = decode_json(response.content)
             except:
                 json_result = None
 
-            if len(json_result) == 2                  and \
-                'status' in json_result               and \
-                ('time_delta' in json_result or
-                 'time-delta' in json_result    )     and \
-                json_result['status'].lower() == 'ok'     :
-                if 'time_delta' in json_result:
-                    try:
-                        result = int(json_result['time_delta'])
-                    except:
-                        result = None
-                else:
-                    try:
-                        result = int(json_result['time-delta'])
-                    except:
-                        result = None
-            else:
-                result = None
+            result = self.__parse_time_delta(json_result)
         else:
             result = None
 
         return result
 
 
-    def __post_message(self, fixed_slug, secret, payload):
+    async def __time_delta_async(self):
         """
-        Function that can be used to send an arbitrary message to an Inesonic
-        website via a HTTPS post method.
-
-        :param fixed_slug:
-            The fixed slug to be used.
-
-        :param secret:
-            The secret used to generate and decode the hash.
-
-        :param payload:
-            A data structure to be sent.  The data structure will be converted to
-            JSON format as needed.
+        Coroutine version of :meth:`__time_delta`.
 
         :return:
-            Returns the response sent by the site or None if a bad response was
-            received.
+            Returns the measured time delta, in seconds, or None if not time delta
+            could be determined.
 
-        :type fixed_slug: str
-        :type secret:     bytes or bytearray
-        :type payload:    dict
+        :rtype: int or None
 
         """
 
-        url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
-        raw_message = json.dumps(payload).encode('utf-8')
-
-        hash_time_value = int(
-              (int(time.time()) + self.__current_time_delta)
-            / 30
+        message_payload = { 'timestamp' : int(time.time()) }
+        status_code, content, headers = await self.__post_async(
+            self.__time_delta_url,
+            encode_json(message_payload),
+            'application/json'
         )
 
-        hash_time_data = struct.pack('<Q', hash_time_value)
-        key = secret + hash_time_data
+        if status_code == 200:
+            try:
+                json_result = decode_json(content)
+            except:
+                json_result = None
 
-        raw_hash = hmac.new(
-            key = key,
-            msg = raw_message,
-            digestmod = HASH_ALGORITHM
-        ).digest()
+            result = self.__parse_time_delta(json_result)
+        else:
+            result = None
 
-        encoded_message = base64.b64encode(raw_message)
-        encoded_hash = base64.b64encode(raw_hash)
+        return result
 
-        message_payload = {
-            'data' : encoded_message.decode('utf-8'),
-            'hash' : encoded_hash.decode('utf-8')
-        }
 
-        payload = json.dumps(message_payload)
-        try:
-            response = requests.post(
-                url,
-                data = payload,
-                headers = {
-                    'User-Agent' : 'Inesonic, LLC',
-                    'Content-Type' : 'application/json',
-                    'Content-Length' : str(len(payload))
-                }
-            )
-        except requests.exceptions.ConnectionError as e:
-            response = None
-            cherrypy.log(
-                "*** No response from %s: %s"%(url, str(e))
-            )
+    def __time_delta_updated(self, used_time_delta):
+        """
+        Method that is called when a message is rejected as unauthorized.  The
+        time delta is queried from the remote server unless it has already
+        changed since the message was signed or was queried too recently.
+        Callers rejected while a query is in progress wait for that query.
 
-        if response is not None and response.status_code == 200:
-            try:
-                result = json.loads(response.text)
-            except:
-                result = None
+        :param used_time_delta:
+            The time delta used to sign the rejected message.
+
+        :return:
+            Returns True if the message should be signed and sent again.
+            Returns False if no newer time delta is available.
+
+        :type used_time_delta: int
+        :rtype:                bool
+
+        """
+
+        with self.__time_delta_lock:
+            if self.__current_time_delta != used_time_delta:
+                result = True
+            elif self.__time_delta_refresh_allowed():
+                new_time_delta = self.__time_delta()
+                if new_time_delta is not None:
+                    self.__current_time_delta = new_time_delta
+                    result = True
+                else:
+                    result = False
+            else:
+                result = False
+
+        return result
+
+
+    async def __time_delta_updated_async(self, used_time_delta):
+        """
+        Coroutine version of :meth:`__time_delta_updated`.  Coroutines
+        rejected while a query is in progress await that query.
+
+        :param used_time_delta:
+            The time delta used to sign the rejected message.
+
+        :return:
+            Returns True if the message should be signed and sent again.
+            Returns False if no newer time delta is available.
+
+        :type used_time_delta: int
+        :rtype:                bool
+
+        """
+
+        if self.__time_delta_async_lock is None:
+            self.__time_delta_async_lock = asyncio.Lock()
+
+        async with self.__time_delta_async_lock:
+            if self.__current_time_delta != used_time_delta:
+                result = True
+            elif self.__time_delta_refresh_allowed():
+                new_time_delta = await self.__time_delta_async()
+                if new_time_delta is not None:
+                    self.__current_time_delta = new_time_delta
+                    result = True
+                else:
+                    result = False
+            else:
+                result = False
+
+        return result
+
+
+    def __time_delta_refresh_allowed(self):
+        """
+        Method that determines if enough time has passed to query the time
+        delta again.  Calling this method records a new query attempt when the
+        query is allowed.
+
+        :return:
+            Returns True if the time delta can be queried.  Returns False if
+            the time delta was queried too recently.
+
+        :rtype: bool
+
+        """
+
+        now = time.time()
+        elapsed = now - self.__last_time_delta_query
+        if elapsed > self.__minimum_time_delta_refresh:
+            self.__last_time_delta_query = now
+            result = True
+        else:
+            result = False
+
+        return result
+
+
+    def __parse_time_delta(self, json_result):
+        """
+        Method that extracts the time delta from a time delta response.
+
+        :param json_result:
+            The decoded response from the remote server.
+
+        :return:
+            Returns the reported time delta, in seconds, or None if the
+            response is invalid.
+
+        :type json_result: dict or None
+        :rtype:            int or None
+
+        """
+
+        if json_result is not None                and \
+            len(json_result) == 2                 and \
+            'status' in json_result               and \
+            ('time_delta' in json_result or
+             'time-delta' in json_result    )     and \
+            json_result['status'].lower() == 'ok'     :
+            if 'time_delta' in json_result:
+                try:
+                    result = int(json_result['time_delta'])
+                except:
+                    result = None
+            else:
+                try:
+                    result = int(json_result['time-delta'])
+                except:
+                    result = None
         else:
             result = None
 
         return result
 
 
-    def __post_binary_message(self, fixed_slug, secret, payload):
+    def __post_message(
+        self,
+        url,
+        secret,
+        payload,
+        customer_identifier = None
+        ):
         """
         Function that can be used to send an arbitrary message to an Inesonic
         website via a HTTPS post method.
 
-        :param fixed_slug:
-            The fixed slug to be used.
+        :param url:
+            The URL to post to.
 
         :param secret:
             The secret used to generate and decode the hash.
@@ -406,133 +847,492 @@ class Server(object):
             A data structure to be sent.  The data structure will be converted to
             JSON format as needed.
 
+        :param customer_identifier:
+            The customer identifier to include with the message.  No customer
+            identifier is sent if this value is None.
+
         :return:
-            Returns the a tuple containing the status code, raw data, and the
-            response headers.
+            Returns a tuple holding the status code and the response sent by
+            the site.  The status code is None if no response was received.
+            The response is None if a bad response was received.
 
-        :type fixed_slug: str
-        :type secret:     bytes or bytearray
-        :type payload:    dict
-        :rtype:           bytes, dict, or None
+        :type url:                 str
+        :type secret:              bytes or bytearray
+        :type payload:             dict
+        :type customer_identifier: str or None
+        :rtype:                    tuple
 
         """
 
-        url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
-
-        hash_time_value = int(
-              (int(time.time()) + self.__current_time_delta)
-            / 30
+        payload = self.__build_message_payload(
+            secret,
+            payload,
+            customer_identifier
         )
+        response = self.__post(url, payload, 'application/json')
+        if response is not None:
+            status_code = response.status_code
+            if status_code == 200:
+                try:
+                    result = decode_json(response.content)
+                except:
+                    result = None
+            else:
+                result = None
+        else:
+            status_code = None
+            result = None
+
+        return (status_code, result)
+
+
+    async def __post_message_async(
+        self,
+        url,
+        secret,
+        payload,
+        customer_identifier = None
+        ):
+        """
+        Coroutine version of :meth:`__post_message`.
 
-        hash_time_data = struct.pack('<Q', hash_time_value)
-        key = secret + hash_time_data
+        :param url:
+            The URL to post to.
 
-        raw_hash = hmac.new(
-            key = key,
-            msg = payload,
-            digestmod = HASH_ALGORITHM
-        ).digest()
+        :param secret:
+            The secret used to generate and decode the hash.
+
+        :param payload:
+            A data structure to be sent.  The data structure will be converted to
+            JSON format as needed.
+
+        :param customer_identifier:
+            The customer identifier to include with the message.  No customer
+            identifier is sent if this value is None.
+
+        :return:
+            Returns a tuple holding the status code and the response sent by
+            the site.  The status code is None if no response was received.
+            The response is None if a bad response was received.
 
-        data_to_send = bytearray(payload)
-        data_to_send.extend(raw_hash)
+        :type url:                 str
+        :type secret:              bytes or bytearray
+        :type payload:             dict
+        :type customer_identifier: str or None
+        :rtype:                    tuple
 
-        response = requests.post(
+        """
+
+        payload = self.__build_message_payload(
+            secret,
+            payload,
+            customer_identifier
+        )
+        status_code, content, headers = await self.__post_async(
             url,
-            data = bytes(data_to_send),
-            headers = {
-                'User-Agent' : 'Inesonic, LLC',
-                'Content-Type' : 'application/octet-stream',
-                'Content-Length' : str(len(data_to_send))
-            }
+            payload,
+            'application/json'
         )
 
-        return (response.status_code, response.content, response.headers )
+        if status_code == 200:
+            try:
+                result = decode_json(content)
+            except:
+                result = None
+        else:
+            result = None
 
+        return (status_code, result)
 
-    def post_customer_message(
+
+    def __post(self, url, data, content_type):
+        """
+        Method that posts serialized data to the remote server.  The
+        Content-Length header is generated from the data.
+
+        :param url:
+            The URL to post to.
+
+        :param data:
+            The serialized data to be sent.
+
+        :param content_type:
+            The content type to report for the data.
+
+        :return:
+            Returns the response or None if no response was received.
+
+        :type url:          str
+        :type data:         bytes
+        :type content_type: str
+        :rtype:             requests.Response, httpx.Response, or None
+
+        """
+
+        headers = { 'Content-Type' : content_type }
+        if self.__http2:
+            # The httpx transport only retries failed connections so transient
+            # server errors are retried here to match the urllib3 policy.
+            attempts_remaining = MAXIMUM_RETRIES + 1
+            retry_delay = RETRY_BACKOFF_FACTOR
+            while attempts_remaining > 0:
+                attempts_remaining -= 1
+                try:
+                    response = self.__session.post(
+                        url,
+                        content = data,
+                        headers = headers
+                    )
+                except httpx.TransportError as e:
+                    response = None
+                    attempts_remaining = 0
+                    cherrypy.log(
+                        "*** No response from %s: %s"%(url, str(e))
+                    )
+
+                if response is not None                            and \
+                   response.status_code in RETRY_STATUS_CODES     and \
+                   attempts_remaining > 0                              :
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                else:
+                    attempts_remaining = 0
+        else:
+            try:
+                response = self.__session.post(
+                    url,
+                    data = data,
+                    headers = headers
+                )
+            except requests.exceptions.ConnectionError as e:
+                response = None
+                cherrypy.log(
+                    "*** No response from %s: %s"%(url, str(e))
+                )
+
+        return response
+
+
+    async def __post_async(self, url, data, content_type):
+        """
+        Coroutine version of :meth:`__post`.
+
+        :param url:
+            The URL to post to.
+
+        :param data:
+            The serialized data to be sent.
+
+        :param content_type:
+            The content type to report for the data.
+
+        :return:
+            Returns a tuple holding the status code, the response content, and
+            the response headers.  All values are None if no response was
+            received.
+
+        :type url:          str
+        :type data:         bytes
+        :type content_type: str
+        :rtype:             tuple
+
+        """
+
+        session = self.__async_session_instance()
+        try:
+            async with session.post(
+                url,
+                data = data,
+                headers = { 'Content-Type' : content_type }
+            ) as response:
+                status_code = response.status
+                content = await response.read()
+                headers = response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status_code = None
+            content = None
+            headers = None
+            cherrypy.log(
+                "*** No response from %s: %s"%(url, str(e))
+            )
+
+        return (status_code, content, headers)
+
+
+    def __build_message_payload(
         self,
-        slug,
-        customer_identifier,
-        customer_secret,
-        message
+        secret,
+        payload,
+        customer_identifier = None
         ):
         """
-        Method that will issue a request to a remote server.  If needed, the
-        method will query for an updated tiem delta and perform several
-        retries.
+        Method that serializes and signs a message, returning the JSON
+        envelope to be sent to the remote server.
 
-        :param slug:
-            The slug to be used.
+        :param secret:
+            The secret used to generate and decode the hash.
+
+        :param payload:
+            A data structure to be sent.  The data structure will be converted to
+            JSON format as needed.
 
         :param customer_identifier:
-            The customer identifier used to identify this customer.
+            The customer identifier to include in the envelope.  No customer
+            identifier is included if this value is None.
+
+        :return:
+            Returns the JSON encoded envelope.
+
+        :type secret:              bytes or bytearray
+        :type payload:             dict
+        :type customer_identifier: str or None
+        :rtype:                    bytes
+
+        """
+
+        raw_message = encode_json(payload)
+
+        raw_hash = self.__message_hash(secret, raw_message)
+
+        encoded_message = base64.b64encode(raw_message)
+        encoded_hash = base64.b64encode(raw_hash)
+
+        if customer_identifier is not None:
+            prefix = b''.join((
+                b'{"cid":', encode_json(customer_identifier),
+                b',"data":"'
+            ))
+        else:
+            prefix = b'{"data":"'
+
+        # Base-64 data never needs escaping so the envelope is assembled
+        # directly rather than decoding and serializing the encoded message a
+        # second time.
+        return b''.join((
+            prefix, encoded_message,
+            b'","hash":"', encoded_hash,
+            b'"}'
+        ))
 
-        :param customer_secret:
-            The customer specific secret to be used to authenticate the
-            message.
+
+    def __message_hash(self, secret, message):
+        """
+        Method that calculates the HMAC of a message for the current time
+        window.  The keyed HMAC state is cached for each secret so that only
+        the message needs to be hashed while the time window is unchanged.
+
+        :param secret:
+            The secret used to generate the hash.
 
         :param message:
-            A dictionary holding the message to be sent.
+            The raw message to be hashed.
 
         :return:
-            Returns a dictionary with the response or None if an error occured.
+            Returns the raw hash.
 
-        :type slug:                str
-        :type customer_identifier: str
-        :type customer_secret:     bytes or bytearray
-        :type message:             dict
-        :rtype:                    dict or None
+        :type secret:  bytes or bytearray
+        :type message: bytes or bytearray
+        :rtype:        bytes
 
         """
 
-        url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
-        raw_message = json.dumps(payload).encode('utf-8')
-
-        hash_time_value = int(
-              (int(time.time()) + self.__current_time_delta)
-            / 30
+        hash_time_value = (
+            (int(time.time()) + self.__current_time_delta) // 30
         )
 
-        hash_time_data = struct.pack('<Q', hash_time_value)
-        key = customer_secret + hash_time_data
+        if hash_time_value != self.__hmac_cache_window:
+            self.__hmac_cache.clear()
+            self.__hmac_cache_window = hash_time_value
 
-        raw_hash = hmac.new(
-            key = key,
-            msg = raw_message,
-            digestmod = HASH_ALGORITHM
-        ).digest()
+        cache_key = bytes(secret)
+        keyed_hmac = self.__hmac_cache.get(cache_key)
+        if keyed_hmac is None:
+            hash_time_data = HASH_TIME_STRUCT.pack(hash_time_value)
+            key = secret + hash_time_data
 
-        encoded_message = base64.b64encode(raw_message)
-        encoded_hash = base64.b64encode(raw_hash)
+            keyed_hmac = HmacContext(key)
+            self.__hmac_cache[cache_key] = keyed_hmac
+
+        # The precomputed pad states are faster than hmac.new or the one-shot
+        # hmac.digest function, both of which repeat the key setup for every
+        # message.
+        return keyed_hmac.digest(message)
+
+
+    def __async_session_instance(self):
+        """
+        Method that returns the aiohttp client session used by the
+        asynchronous API, creating it on first use.  The session is bound to
+        the running event loop.
+
+        :return:
+            Returns the client session.
+
+        :rtype: aiohttp.ClientSession
+
+        """
+
+        if aiohttp is None:
+            raise RuntimeError(
+                "The aiohttp module is required for async posts"
+            )
+
+        if self.__async_session is None:
+            self.__async_session = aiohttp.ClientSession(
+                connector = aiohttp.TCPConnector(
+                    limit = ASYNC_CONNECTION_LIMIT,
+                    ttl_dns_cache = ASYNC_DNS_CACHE_TIMEOUT
+                ),
+                headers = { 'User-Agent' : USER_AGENT }
+            )
+
+        return self.__async_session
+
+
+    def __post_binary_message(self, url, secret, payload):
+        """
+        Function that can be used to send an arbitrary message to an Inesonic
+        website via a HTTPS post method.
+
+        :param url:
+            The URL to post to.
+
+        :param secret:
+            The secret used to generate and decode the hash.
+
+        :param payload:
+            A data structure to be sent.  The data structure will be converted to
+            JSON format as needed.
+
+        :return:
+            Returns the a tuple containing the status code, raw data, and the
+            response headers.
+
+        :type url:     str
+        :type secret:  bytes or bytearray
+        :type payload: bytes or bytearray
+        :rtype:        tuple
+
+        """
+
+        raw_hash = self.__message_hash(secret, payload)
+        data_to_send = b''.join((payload, raw_hash))
+
+        response = self.__post(url, data_to_send, 'application/octet-stream')
+        if response is not None:
+            result = (response.status_code, response.content, response.headers)
+        else:
+            result = (None, None, None)
+
+        return result
+
+
+    async def __post_binary_message_async(self, url, secret, payload):
+        """
+        Coroutine version of :meth:`__post_binary_message`.
+
+        :param url:
+            The URL to post to.
+
+        :param secret:
+            The secret used to generate and decode the hash.
+
+        :param payload:
+            The raw binary message.
 
-        message_payload = {
-            'cid' : customer_identifier,
-            'data' : encoded_message.decode('utf-8'),
-            'hash' : encoded_hash.decode('utf-8')
-        }
+        :return:
+            Returns the a tuple containing the status code, raw data, and the
+            response headers.
+
+        :type url:     str
+        :type secret:  bytes or bytearray
+        :type payload: bytes or bytearray
+        :rtype:        tuple
+
+        """
 
-        payload = json.dumps(message_payload)
-        response = requests.post(
+        raw_hash = self.__message_hash(secret, payload)
+        data_to_send = b''.join((payload, raw_hash))
+
+        return await self.__post_async(
             url,
-            data = payload,
-            headers = {
-                'User-Agent' : 'Inesonic, LLC',
-                'Content-Type' : 'application/json',
-                'Content-Length' : str(len(payload))
-            }
+            data_to_send,
+            'application/octet-stream'
         )
 
-        if response.status_code == 200:
-            try:
-                result = json.loads(response.text)
-            except:
-                result = None
+
+    def __decode_binary_response(self, status_code, response_data, headers):
+        """
+        Method that decodes the response to a binary message.
+
+        :param status_code:
+            The reported status code.
+
+        :param response_data:
+            The raw response data.
+
+        :param headers:
+            The response headers.
+
+        :return:
+            Returns either a dictionary or a bytes instance depending on the
+            content type reported by the server.  None is returned on error.
+
+        :type status_code:   int or None
+        :type response_data: bytes or None
+        :type headers:       dict or None
+        :rtype:              bytes, dict, or None
+
+        """
+
+        if status_code == 200: # OK
+            # Response headers are held in a case insensitive dictionary.
+            content_type = headers.get('Content-Type')
+
+            if content_type is None:
+                try:
+                    result = base64.b64decode(response_data)
+                except:
+                    result = bytes(response_data)
+            else:
+                content_type = content_type.lower()
+                if content_type == 'application/json':
+                    try:
+                        result = decode_json(response_data)
+                    except:
+                        result = None
+                else:
+                    result = bytes(response_data)
         else:
             result = None
 
         return result
 
 
+    def __url(self, slug):
+        """
+        Method that returns the URL for a slug.  URLs are cached so repeated
+        posts to the same endpoint do not rebuild the URL.
+
+        :param slug:
+            The slug to be converted.
+
+        :return:
+            Returns the full URL for the slug.
+
+        :type slug: str
+        :rtype:     str
+
+        """
+
+        url = self.__url_cache.get(slug)
+        if url is None:
+            url = "%s/%s"%(self.__scheme_and_host, self.__fix_slug(slug))
+            self.__url_cache[slug] = url
+
+        return url
+
+
     def __fix_slug(self, slug):
         """
         Method used to fix a provided slug, removing leading and trailing
@@ -583,6 +1383,55 @@ class Server(object):
 # Functions:
 #
 
+def encode_json(value):
+    """
+    Function that converts a data structure to UTF-8 encoded JSON.  The orjson
+    module is used when available, otherwise the json module is used.  Both
+    implementations convert non-string dictionary keys to strings.
+
+    :param value:
+        The data structure to be encoded.
+
+    :return:
+        Returns the encoded JSON.
+
+    :type value: dict or list
+    :rtype:      bytes
+
+    """
+
+    if orjson is not None:
+        result = orjson.dumps(value, option = orjson.OPT_NON_STR_KEYS)
+    else:
+        result = json.dumps(value).encode('utf-8')
+
+    return result
+
+
+def decode_json(data):
+    """
+    Function that converts JSON data to a data structure.  The orjson module
+    is used when available, otherwise the json module is used.
+
+    :param data:
+        The JSON data to be decoded.
+
+    :return:
+        Returns the decoded data structure.
+
+    :type data: bytes, bytearray, or str
+    :rtype:     dict or list
+
+    """
+
+    if orjson is not None:
+        result = orjson.loads(data)
+    else:
+        result = json.loads(data)
+
+    return result
+
+
 def debug_dump_bytes(data):
     """
     Function you can use to dump an bytes or bytearray object.
@@ -598,14 +1447,7 @@ def debug_dump_bytes(data):
 
     """
 
-    s = str()
-    for b in data:
-        if not s:
-            s = "%02X"%int(b)
-        else:
-            s += " %02X"%int(b)
-
-    return s
+    return bytes(data).hex(' ').upper()
 
 ###############################################################################
 # Main:
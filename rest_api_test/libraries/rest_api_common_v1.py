@@ -39,6 +39,76 @@ also minimizing computation time for the selected hash algorithm.
 
 """
 
+HMAC_INNER_PAD_TABLE = bytes(b ^ 0x36 for b in range(256))
+"""
+Translation table used to apply the HMAC inner pad to a key.
+
+"""
+
+HMAC_OUTER_PAD_TABLE = bytes(b ^ 0x5C for b in range(256))
+"""
+Translation table used to apply the HMAC outer pad to a key.
+
+"""
+
+###############################################################################
+# Class HmacContext:
+#
+
+class HmacContext(object):
+    """
+    Class that holds a keyed HMAC, precomputing the hash states for the inner
+    and outer padded keys so only the message needs to be hashed for each
+    digest.  A secret of SECRET_LENGTH bytes combined with the 8 byte time
+    value fills exactly one hash block.
+
+    """
+
+    def __init__(self, key):
+        """
+        Method that initializes the HmacContext class.
+
+        :param key:
+            The HMAC key.
+
+        :type key: bytes or bytearray
+
+        """
+
+        super().__init__()
+
+        if len(key) > HASH_BLOCK_SIZE:
+            key = HASH_ALGORITHM(key).digest()
+
+        key = bytes(key).ljust(HASH_BLOCK_SIZE, b'\x00')
+
+        self.__inner = HASH_ALGORITHM(key.translate(HMAC_INNER_PAD_TABLE))
+        self.__outer = HASH_ALGORITHM(key.translate(HMAC_OUTER_PAD_TABLE))
+
+
+    def digest(self, message):
+        """
+        Method that calculates the HMAC of a message.
+
+        :param message:
+            The message to be hashed.
+
+        :return:
+            Returns the raw HMAC.
+
+        :type message: bytes or bytearray
+        :rtype:        bytes
+
+        """
+
+        inner = self.__inner.copy()
+        inner.update(message)
+
+        outer = self.__outer.copy()
+        outer.update(inner.digest())
+
+        return outer.digest()
+
 ###############################################################################
 # Main:
 #